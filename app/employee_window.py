@@ -1,4 +1,3 @@
-from typing import Callable
 import tkinter as tk
 from tkinter import ttk, messagebox
 
@@ -8,13 +7,12 @@ from models.payroll import PayrollDepartment
 class EmployeeWindow:
     """Окно для добавления нового сотрудника."""
 
-    def __init__(self, parent: tk.Tk, payroll: PayrollDepartment, callback: Callable | None = None) -> None:
+    def __init__(self, parent: tk.Tk, payroll: PayrollDepartment) -> None:
         self.window = tk.Toplevel(parent)
         self.window.title("Добавление сотрудника")
         self.window.geometry("400x200")
 
         self.payroll = payroll
-        self.callback = callback
 
         self._create_widgets()
 
@@ -39,8 +37,6 @@ class EmployeeWindow:
             name = str(self.name_entry.get().strip())
 
             self.payroll.add_employee(name)
-            if self.callback:
-                self.callback()
 
             messagebox.showinfo("Успех", f"Сотрудник '{name}' успешно добавлен")
             self.window.destroy()
@@ -1,3 +1,4 @@
+from datetime import date
 from typing import Optional, Any
 import json
 import tkinter as tk
@@ -6,9 +7,16 @@ from tkinter import ttk, messagebox, filedialog
 from app.employee_window import EmployeeWindow
 from app.rate_window import RateWindow
 from app.work_window import WorkWindow
+from models.change_event import ChangeEvent, coalesce_events
+from models.change_type import ChangeType
+from models.report import export_report
+from models.snapshot import SNAPSHOT_FORMAT_VERSION, build_delta, merge_snapshot_with_deltas
+from models.money import format_money
 from models.work_type import WorkType
 from models.payroll import PayrollDepartment
 
+REFRESH_DELAY_MS = 50  # задержка объединения частых изменений перед обновлением таблицы
+
 
 class MainWindow:
     """Главное окно приложения для управления системой расчета зарплат."""
@@ -16,16 +24,20 @@ class MainWindow:
     def __init__(self) -> None:
         self.root = tk.Tk()
         self.root.title("Система расчета зарплат")
-        self.root.geometry("1115x600")
+        self.root.geometry("1380x600")
 
         self.payroll = PayrollDepartment()
+        self.payroll.db_manager.enable_replica()
         self.tree = None
         self.context_menu = None
         self.sort_column = "Имя"
         self.sort_reverse = False
+        self.pending_events = []
+        self.refresh_job = None
 
         self._create_widgets()
         self._update_table()
+        self.payroll.events.subscribe(self._on_changes)
 
     def run(self) -> None:
         """Запуск главного цикла приложения."""
@@ -49,6 +61,8 @@ class MainWindow:
             ("Управление ставками", self._open_rates),
             ("Загрузить из файла", self._load_from_file),
             ("Сохранить в файл", self._save_to_file),
+            ("Сохранить изменения", self._save_changes_to_file),
+            ("Экспорт отчета", self._export_report),
         ]
 
         for text, command in buttons:
@@ -102,28 +116,67 @@ class MainWindow:
         for item in self.tree.get_children():
             self.tree.delete(item)
 
-        for name, employee in self.payroll.employees.items():
-            total_salary = employee.calculate_salary(self.payroll.work_rates)
-            self.tree.insert("", tk.END, values=(name, f"{total_salary:.2f}"))
+        for name in self.payroll.employees:
+            total_salary = self.payroll.get_employee_salary(name)
+            self.tree.insert("", tk.END, iid=name, values=(name, format_money(total_salary)))
 
         if hasattr(self, "sort_column"):
             self._sort_column(self.sort_column)
             self._sort_column(self.sort_column)
 
+    def _on_changes(self, events: list[ChangeEvent]) -> None:
+        """Накопление событий изменения данных и отложенное обновление таблицы."""
+        self.pending_events.extend(events)
+        if self.refresh_job is None:
+            self.refresh_job = self.root.after(REFRESH_DELAY_MS, self._apply_changes)
+
+    def _apply_changes(self) -> None:
+        """Обновление только тех строк таблицы, которых коснулись накопленные изменения."""
+        self.refresh_job = None
+        events = coalesce_events(self.pending_events)
+        self.pending_events = []
+
+        change_types = {event.change_type for event in events}
+        if change_types & {ChangeType.DATA_CLEARED, ChangeType.EMPLOYEES_CLEARED}:
+            self._update_table()
+            return
+
+        if ChangeType.RATE_CHANGED in change_types:
+            names = set(self.payroll.employees)
+        else:
+            names = {event.name for event in events if event.change_type != ChangeType.EMPLOYEE_DELETED}
+
+        for event in events:
+            if event.change_type == ChangeType.EMPLOYEE_DELETED and self.tree.exists(event.name):
+                self.tree.delete(event.name)
+
+        for name in names:
+            if name not in self.payroll.employees:
+                continue
+            total_salary = format_money(self.payroll.get_employee_salary(name))
+            if self.tree.exists(name):
+                self.tree.set(name, "Зарплата", total_salary)
+            else:
+                self.tree.insert("", tk.END, iid=name, values=(name, total_salary))
+
+        if names:
+            self._sort_column(self.sort_column)
+            self._sort_column(self.sort_column)
+
     def _open_rates(self) -> None:
         """Открытие окна управления ставками."""
-        RateWindow(self.root, self.payroll, callback=self._update_table)
+        RateWindow(self.root, self.payroll)
 
     def _open_add_employee(self) -> None:
         """Открытие окна добавления нового сотрудника."""
-        EmployeeWindow(self.root, self.payroll, callback=self._update_table)
+        EmployeeWindow(self.root, self.payroll)
 
     def _open_add_work(self) -> None:
         """Открытие окна добавления работы."""
         if not self.payroll.employees:
             messagebox.showwarning("Предупреждение", "Сначала добавьте сотрудника")
             return
-        WorkWindow(self.root, self.payroll, callback=self._update_table)
+        WorkWindow(self.root, self.payroll)
 
     def _clear_all_employees(self) -> None:
         """Удаление всех сотрудников из системы с подтверждением."""
@@ -134,25 +187,27 @@ class MainWindow:
 
             if messagebox.askyesno("Подтверждение", "Вы уверены, что хотите удалить всех сотрудников?"):
                 self.payroll.clear_all_employees()
-                self._update_table()
                 messagebox.showinfo("Успех", "Все сотрудники удалены")
 
         except Exception as e:
             messagebox.showerror("Ошибка", f"Произошла ошибка: {str(e)}")
 
     def _delete_employee(self) -> None:
-        """Удаление выбранного сотрудника с подтверждением."""
+        """Удаление выбранных сотрудников с подтверждением."""
         try:
             selected = self.tree.selection()
             if not selected:
                 messagebox.showwarning("Предупреждение", "Выберите сотрудника для удаления")
                 return
 
-            employee_name = self.tree.item(selected[0])["values"][0]
-            if messagebox.askyesno("Подтверждение", f"Удалить сотрудника '{employee_name}'?"):
-                self.payroll.delete_employee(str(employee_name))
-                self._update_table()
-                messagebox.showinfo("Успех", f"Сотрудник '{employee_name}' удален")
+            names = [str(self.tree.item(item)["values"][0]) for item in selected]
+            question = f"Удалить сотрудника '{names[0]}'?" if len(names) == 1 else f"Удалить сотрудников: {len(names)}?"
+            if messagebox.askyesno("Подтверждение", question):
+                self.payroll.delete_employees(names)
+                if len(names) == 1:
+                    messagebox.showinfo("Успех", f"Сотрудник '{names[0]}' удален")
+                else:
+                    messagebox.showinfo("Успех", f"Удалено сотрудников: {len(names)}")
 
         except Exception as e:
             messagebox.showerror("Ошибка", f"Произошла ошибка: {str(e)}")
@@ -174,59 +229,129 @@ class MainWindow:
             messagebox.showerror("Ошибка", f"Не удалось сохранить файл: {str(e)}")
 
     def _prepare_data_for_save(self) -> dict[str, Any]:
-        """Подготовка данных для сохранения в файл."""
+        """Подготовка данных для сохранения в файл (минуты и копейки целыми числами)."""
         return {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
             "employees": {
                 name: {
                     "works": [
-                        {work_type.name: hours for work_type, hours in work.items()}
+                        {
+                            "work_type": work.work_type.name,
+                            "minutes": work.minutes,
+                            "date": work.work_date.isoformat(),
+                        }
                         for work in employee.works
                     ],
                 }
                 for name, employee in self.payroll.employees.items()
             },
-            "work_rates": {wt.name: rate for wt, rate in self.payroll.work_rates.items()},
+            "work_rates": {
+                wt.name: [
+                    {"effective_from": effective_from.isoformat(), "rate_kopecks": rate}
+                    for effective_from, rate in entries
+                ]
+                for wt, entries in self.payroll.rate_timeline.history().items()
+            },
+            "database_id": self.payroll.get_database_id(),
+            "token": self.payroll.get_change_token(),
         }
 
+    def _save_changes_to_file(self) -> None:
+        """Сохранение изменений, сделанных после выбранного снимка, в JSON файл."""
+        base_filename = filedialog.askopenfilename(
+            title="Выберите снимок, от которого строятся изменения",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+        )
+        if not base_filename:
+            return
+
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".json", filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+        )
+        if not filename:
+            return
+
+        try:
+            with open(base_filename, "r", encoding="utf-8") as f:
+                base = json.load(f)
+            base_token, database_id = base["token"], base["database_id"]
+            token = self.payroll.get_change_token()
+            changes = self.payroll.get_changes_since(base_token, database_id)
+            data = build_delta(changes, database_id, base_token, token)
+            self._write_data_to_file(filename, data)
+            messagebox.showinfo("Успех", f"Изменений сохранено: {len(data['changes'])}")
+        except KeyError:
+            messagebox.showerror("Ошибка", "Выбранный файл не содержит токена снимка или идентификатора БД")
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось сохранить изменения: {str(e)}")
+
+    def _export_report(self) -> None:
+        """Выгрузка плоского отчета по зарплатам и часам в сжатый CSV или Parquet."""
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".csv.gz",
+            filetypes=[("CSV (gzip)", "*.csv.gz"), ("Parquet", "*.parquet"), ("CSV", "*.csv")],
+        )
+
+        if not filename:
+            return
+
+        try:
+            count = export_report(self.payroll, filename)
+            messagebox.showinfo("Успех", f"Отчет сохранен, сотрудников: {count}")
+        except Exception as e:
+            messagebox.showerror("Ошибка", f"Не удалось сохранить отчет: {str(e)}")
+
     def _write_data_to_file(self, filename: str, data: dict[str, Any]) -> None:
         """Запись данных в файл."""
         with open(filename, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=4, ensure_ascii=False)
 
     def _load_from_file(self) -> None:
-        """Загрузка данных о сотрудниках и ставках из JSON файла."""
-        filename = filedialog.askopenfilename(filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
+        """Загрузка данных о сотрудниках и ставках из JSON файла (снимка и, при наличии, файлов изменений)."""
+        filenames = filedialog.askopenfilenames(filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
 
-        if not filename:
+        if not filenames:
             return
 
         try:
             if messagebox.askyesno("Подтверждение", "Текущие данные будут удалены. Продолжить?"):
-                self._load_data_from_file(filename)
-                self._update_table()
+                self._load_data_from_file(filenames)
                 messagebox.showinfo("Успех", "Данные успешно загружены")
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить файл: {str(e)}")
 
-    def _load_data_from_file(self, filename: str) -> None:
-        """Загрузка и обработка данных из файла."""
-        with open(filename, "r", encoding="utf-8") as f:
-            data = json.load(f)
+    def _load_data_from_file(self, filenames: tuple[str, ...]) -> None:
+        """Загрузка и обработка данных из файлов: снимок и применяемые к нему изменения."""
+        files_data = []
+        for filename in filenames:
+            with open(filename, "r", encoding="utf-8") as f:
+                files_data.append(json.load(f))
+        data = merge_snapshot_with_deltas(files_data)
 
-        self.payroll.clear_data()
-
-        try:
-            # Загрузка ставок
-            for work_type_name, rate in data["work_rates"].items():
-                self.payroll.add_work_rate(WorkType[work_type_name], rate)
-
-            # Загрузка сотрудников и их работ
-            for name, employee_data in data["employees"].items():
-                self.payroll.add_employee(name)
-                for work in employee_data["works"]:
-                    for work_type_name, hours in work.items():
-                        self.payroll.add_work(name, WorkType[work_type_name], hours)
-
-        except Exception as e:
+        with self.payroll.events.batch():
             self.payroll.clear_data()
-            raise Exception(f"Ошибка при загрузке данных: {str(e)}")
+
+            try:
+                # Загрузка ставок
+                for work_type_name, entries in data["work_rates"].items():
+                    for entry in entries:
+                        self.payroll.add_work_rate(
+                            WorkType[work_type_name],
+                            entry["rate_kopecks"],
+                            date.fromisoformat(entry["effective_from"]),
+                        )
+
+                # Загрузка сотрудников и их работ
+                for name, employee_data in data["employees"].items():
+                    self.payroll.add_employee(name)
+                    for work in employee_data["works"]:
+                        self.payroll.add_work(
+                            name,
+                            WorkType[work["work_type"]],
+                            work["minutes"],
+                            date.fromisoformat(work["date"]),
+                        )
+
+            except Exception as e:
+                self.payroll.clear_data()
+                raise Exception(f"Ошибка при загрузке данных: {str(e)}")
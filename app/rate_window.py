@@ -1,7 +1,8 @@
-from typing import Callable
+from datetime import date
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+from models.money import format_money, rate_to_kopecks
 from models.work_type import WorkType
 from models.payroll import PayrollDepartment
 
@@ -9,13 +10,12 @@ from models.payroll import PayrollDepartment
 class RateWindow:
     """Окно управления ставками для различных типов работ."""
 
-    def __init__(self, parent: tk.Tk, payroll: PayrollDepartment, callback: Callable | None = None) -> None:
+    def __init__(self, parent: tk.Tk, payroll: PayrollDepartment) -> None:
         self.window = tk.Toplevel(parent)
         self.window.title("Управление ставками")
         self.window.geometry("400x500")
 
         self.payroll = payroll
-        self.callback = callback
 
         self._create_widgets()
         self._load_rates()
@@ -27,11 +27,13 @@ class RateWindow:
 
     def _create_treeview(self) -> None:
         """Создание таблицы ставок."""
-        self.tree = ttk.Treeview(self.window, columns=("Тип", "Ставка"), show="headings")
+        self.tree = ttk.Treeview(self.window, columns=("Тип", "Действует с", "Ставка"), show="headings")
 
         self.tree.heading("Тип", text="Тип работы")
+        self.tree.heading("Действует с", text="Действует с")
         self.tree.heading("Ставка", text="Ставка за час")
-        self.tree.column("Тип", width=200, anchor="center")
+        self.tree.column("Тип", width=140, anchor="center")
+        self.tree.column("Действует с", width=120, anchor="center")
         self.tree.column("Ставка", width=100, anchor="center")
 
         self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -42,6 +44,7 @@ class RateWindow:
         form_frame = self._create_form_frame()
         self._create_work_type_section(form_frame)
         self._create_rate_section(form_frame)
+        self._create_effective_from_section(form_frame)
         self._create_button_section(form_frame)
 
     def _create_form_frame(self) -> ttk.LabelFrame:
@@ -68,6 +71,13 @@ class RateWindow:
         self.rate_entry = ttk.Entry(parent)
         self.rate_entry.pack(fill=tk.X, padx=5, pady=2)
 
+    def _create_effective_from_section(self, parent: ttk.LabelFrame) -> None:
+        """Создание секции ввода даты начала действия ставки."""
+        ttk.Label(parent, text="Действует с (ГГГГ-ММ-ДД, пусто — всегда):").pack(anchor=tk.W, padx=5, pady=2)
+        self.effective_from_entry = ttk.Entry(parent)
+        self.effective_from_entry.insert(0, date.today().isoformat())
+        self.effective_from_entry.pack(fill=tk.X, padx=5, pady=2)
+
     def _create_button_section(self, parent: ttk.LabelFrame) -> None:
         """Создание секции с кнопками."""
         button_frame = ttk.Frame(parent)
@@ -81,19 +91,24 @@ class RateWindow:
         if not item:
             return
 
-        work_type_name, current_rate = self.tree.item(item)["values"]
+        work_type_name, effective_from, current_rate = self.tree.item(item)["values"]
 
         self.work_type_var.set(work_type_name)
         self.rate_entry.delete(0, tk.END)
         self.rate_entry.insert(0, current_rate)
+        self.effective_from_entry.delete(0, tk.END)
+        if effective_from != "—":
+            self.effective_from_entry.insert(0, effective_from)
 
     def _load_rates(self) -> None:
         """Загрузка существующих ставок в таблицу"""
         for item in self.tree.get_children():
             self.tree.delete(item)
 
-        for work_type, rate in self.payroll.work_rates.items():
-            self.tree.insert("", tk.END, values=(work_type.name, f"{rate:.2f}"))
+        for work_type, entries in self.payroll.rate_timeline.history().items():
+            for effective_from, rate in entries:
+                effective_from_text = "—" if effective_from == date.min else effective_from.isoformat()
+                self.tree.insert("", tk.END, values=(work_type.name, effective_from_text, format_money(rate)))
 
     def _add_rate(self) -> None:
         """Добавление или обновление ставки"""
@@ -106,15 +121,16 @@ class RateWindow:
             if not rate:
                 raise ValueError("Введите ставку")
 
-            self.payroll.add_work_rate(WorkType[work_type_name], float(rate))
+            effective_from = self.effective_from_entry.get().strip()
+            effective_from = date.fromisoformat(effective_from) if effective_from else None
+
+            rate_kopecks = rate_to_kopecks(rate)
+            self.payroll.add_work_rate(WorkType[work_type_name], rate_kopecks, effective_from)
 
             self._load_rates()
             self._clear_form()
 
-            if self.callback:
-                self.callback()
-
-            messagebox.showinfo("Успех", f"Ставка для {work_type_name} установлена: {float(rate):.2f}")
+            messagebox.showinfo("Успех", f"Ставка для {work_type_name} установлена: {format_money(rate_kopecks)}")
 
         except Exception as e:
             messagebox.showerror("Ошибка", f"Произошла ошибка: {str(e)}")
@@ -123,3 +139,5 @@ class RateWindow:
         """Очистка формы заполнения ставки."""
         self.work_type_var.set("")
         self.rate_entry.delete(0, tk.END)
+        self.effective_from_entry.delete(0, tk.END)
+        self.effective_from_entry.insert(0, date.today().isoformat())
@@ -1,7 +1,8 @@
-from typing import Callable
+from datetime import date
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+from models.money import hours_to_minutes
 from models.work_type import WorkType
 from models.payroll import PayrollDepartment
 
@@ -9,13 +10,12 @@ from models.payroll import PayrollDepartment
 class WorkWindow:
     """Окно добавления работы для сотрудника."""
 
-    def __init__(self, parent: tk.Tk, payroll: PayrollDepartment, callback: Callable | None = None) -> None:
+    def __init__(self, parent: tk.Tk, payroll: PayrollDepartment) -> None:
         self.window = tk.Toplevel(parent)
         self.window.title("Добавление работы")
         self.window.geometry("400x500")
 
         self.payroll = payroll
-        self.callback = callback
 
         self._create_widgets()
 
@@ -47,6 +47,7 @@ class WorkWindow:
         frame = self._create_labeled_frame("Данные работы")
         self._create_work_type_field(frame)
         self._create_hours_field(frame)
+        self._create_date_field(frame)
 
     def _create_work_type_field(self, parent: ttk.LabelFrame) -> None:
         """Создание поля выбора типа работы."""
@@ -66,6 +67,13 @@ class WorkWindow:
         self.hours_entry = ttk.Entry(parent)
         self.hours_entry.pack(fill=tk.X, padx=5, pady=2)
 
+    def _create_date_field(self, parent: ttk.LabelFrame) -> None:
+        """Создание поля ввода даты выполнения работы."""
+        ttk.Label(parent, text="Дата (ГГГГ-ММ-ДД):").pack(anchor=tk.W, padx=5, pady=2)
+        self.date_entry = ttk.Entry(parent)
+        self.date_entry.insert(0, date.today().isoformat())
+        self.date_entry.pack(fill=tk.X, padx=5, pady=2)
+
     def _create_button_section(self) -> None:
         """Создание секции с кнопками."""
         button_frame = ttk.Frame(self.window)
@@ -94,10 +102,13 @@ class WorkWindow:
             if not hours:
                 raise ValueError("Введите количество часов")
 
-            self.payroll.add_work(employee_name, WorkType[work_type_name], float(hours))
+            work_date = self.date_entry.get().strip()
+            if not work_date:
+                raise ValueError("Введите дату работы")
 
-            if self.callback:
-                self.callback()
+            self.payroll.add_work(
+                employee_name, WorkType[work_type_name], hours_to_minutes(hours), date.fromisoformat(work_date)
+            )
 
             messagebox.showinfo("Успех", f"Работа успешно добавлена сотруднику '{employee_name}'")
             self.window.destroy()
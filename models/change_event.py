@@ -0,0 +1,75 @@
+from contextlib import contextmanager
+from typing import Callable, Iterator, NamedTuple
+
+from models.change_type import ChangeType
+from models.work_type import WorkType
+
+
+class ChangeEvent(NamedTuple):
+    """Класс представляет собой событие изменения данных отдела расчета зарплат."""
+    change_type: ChangeType
+    name: str | None = None  # сотрудник, к которому относится изменение
+    work_type: WorkType | None = None  # тип работы или ставки
+
+
+def coalesce_events(events: list[ChangeEvent]) -> list[ChangeEvent]:
+    """Свертка последовательности событий: повторы и события, перекрытые последующими, отбрасываются."""
+    pending: dict[ChangeEvent, None] = {}
+    for event in events:
+        if event.change_type == ChangeType.DATA_CLEARED:
+            pending.clear()
+        elif event.change_type == ChangeType.EMPLOYEES_CLEARED:
+            pending = {e: None for e in pending if e.change_type == ChangeType.RATE_CHANGED}
+        elif event.change_type == ChangeType.EMPLOYEE_DELETED:
+            pending.pop(ChangeEvent(ChangeType.EMPLOYEE_ADDED, event.name), None)
+            for work_type in WorkType:
+                pending.pop(ChangeEvent(ChangeType.WORK_ADDED, event.name, work_type), None)
+        pending[event] = None
+    return list(pending)
+
+
+class ChangePublisher:
+    """Класс для рассылки событий изменения данных подписчикам.
+
+    Подписчики получают список событий. Внутри batch() события накапливаются
+    и после выхода из внешнего блока доставляются одним свернутым списком.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: list[Callable[[list[ChangeEvent]], None]] = []
+        self._batch_depth = 0
+        self._pending: list[ChangeEvent] = []
+
+    def subscribe(self, callback: Callable[[list[ChangeEvent]], None]) -> None:
+        """Подписка на события изменения данных."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[list[ChangeEvent]], None]) -> None:
+        """Отмена подписки на события изменения данных."""
+        self._subscribers.remove(callback)
+
+    def publish(self, event: ChangeEvent) -> None:
+        """Публикация события: немедленно или по окончании текущего пакета."""
+        self._pending.append(event)
+        if not self._batch_depth:
+            self._flush()
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Объединение всех событий внутри блока в одно уведомление."""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._flush()
+
+    def _flush(self) -> None:
+        """Доставка накопленных событий подписчикам."""
+        events = coalesce_events(self._pending)
+        self._pending = []
+        if not events:
+            return
+        for callback in list(self._subscribers):
+            callback(events)
@@ -0,0 +1,11 @@
+from enum import Enum
+
+
+class ChangeType(Enum):
+    """Класс - перечисление типов изменений данных."""
+    EMPLOYEE_ADDED = 1  # добавлен сотрудник
+    EMPLOYEE_DELETED = 2  # удален сотрудник
+    WORK_ADDED = 3  # добавлена работа
+    RATE_CHANGED = 4  # изменена ставка
+    EMPLOYEES_CLEARED = 5  # удалены все сотрудники
+    DATA_CLEARED = 6  # удалены все данные
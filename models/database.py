@@ -1,7 +1,18 @@
+from datetime import date
+from typing import Callable, Iterator
 import sqlite3
+import uuid
 
+from models.change_type import ChangeType
+from models.money import hours_to_minutes, rate_to_kopecks
+from models.work import Work
 from models.work_type import WorkType
 
+SCHEMA_VERSION = 3
+AUTO_VACUUM_INCREMENTAL = 2
+REPLICA_REPLAY_LIMIT = 10_000  # больше изменений выгоднее перенести полной копией
+QUERY_CHUNK_SIZE = 500  # число параметров в одном запросе вида IN (...)
+
 
 class DatabaseManager:
     """Класс для работы с базой данных (Singleton)."""
@@ -17,13 +28,137 @@ class DatabaseManager:
     def __init__(self, db_name: str = "payroll.db") -> None:
         if not self._initialized:
             self.db_name = db_name
+            self._replica = None
+            self._replica_token = 0
+            self._replica_stale = False
             self._init_db()
             self._initialized = True
 
+    def _connect(self) -> sqlite3.Connection:
+        """Открытие соединения с БД с включенной проверкой внешних ключей."""
+        conn = sqlite3.connect(self.db_name)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def _read_connection(self) -> sqlite3.Connection:
+        """Соединение для чтения: актуализированная копия в памяти, если она включена, иначе файл БД."""
+        if self._replica is None:
+            return self._connect()
+        if self._replica_stale:
+            self._sync_replica()
+        return self._replica
+
+    def enable_replica(self) -> None:
+        """Включение копии БД в памяти, из которой выполняются запросы на чтение."""
+        if self._replica is None:
+            self._replica = sqlite3.connect(":memory:")
+            self._replica.execute("PRAGMA foreign_keys = ON")
+            self.refresh_replica()
+
+    def disable_replica(self) -> None:
+        """Отключение копии БД в памяти."""
+        if self._replica is not None:
+            self._replica.close()
+            self._replica = None
+
+    def refresh_replica(self) -> None:
+        """Полная перезагрузка копии в памяти из файла БД через backup API (если копия включена)."""
+        if self._replica is None:
+            return
+        with self._connect() as conn:
+            conn.backup(self._replica)
+        self._replica_token = self._get_token(self._replica.cursor())
+        self._replica_stale = False
+
+    def _sync_replica(self) -> None:
+        """Перенос в копию изменений, записанных в журнал после ее последнего обновления."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            if self._get_token(cursor) - self._replica_token > REPLICA_REPLAY_LIMIT:
+                self.refresh_replica()
+                return
+            cursor.execute(
+                "SELECT seq, change_type, name, work_type, amount, on_date FROM changes WHERE seq > ? ORDER BY seq",
+                (self._replica_token,)
+            )
+            changes = cursor.fetchall()
+
+        with self._replica as replica:
+            cursor = replica.cursor()
+            for change in changes:
+                self._replay_change(cursor, *change[1:])
+            cursor.executemany(
+                "INSERT INTO changes (seq, change_type, name, work_type, amount, on_date) VALUES (?, ?, ?, ?, ?, ?)",
+                changes
+            )
+        if changes:
+            self._replica_token = changes[-1][0]
+        self._replica_stale = False
+
+    @staticmethod
+    def _replay_change(
+        cursor: sqlite3.Cursor,
+        change_type: str,
+        name: str | None,
+        work_type: str | None,
+        amount: int | None,
+        on_date: str | None,
+    ) -> None:
+        """Повторение изменения из журнала на другой копии БД."""
+        change_type = ChangeType[change_type]
+        if change_type == ChangeType.EMPLOYEE_ADDED:
+            cursor.execute("INSERT INTO employees (name) VALUES (?)", (name,))
+        elif change_type == ChangeType.EMPLOYEE_DELETED:
+            cursor.execute("DELETE FROM employees WHERE name = ?", (name,))
+        elif change_type == ChangeType.WORK_ADDED:
+            cursor.execute(
+                "INSERT INTO works (employee_id, work_type, minutes, work_date) "
+                "SELECT id, ?, ?, ? FROM employees WHERE name = ?",
+                (work_type, amount, on_date, name)
+            )
+        elif change_type == ChangeType.RATE_CHANGED:
+            cursor.execute(
+                "INSERT OR REPLACE INTO work_rates (work_type, effective_from, rate_kopecks) VALUES (?, ?, ?)",
+                (work_type, on_date, amount)
+            )
+        elif change_type == ChangeType.EMPLOYEES_CLEARED:
+            cursor.execute("DELETE FROM works")
+            cursor.execute("DELETE FROM employees")
+        elif change_type == ChangeType.DATA_CLEARED:
+            cursor.execute("DELETE FROM works")
+            cursor.execute("DELETE FROM work_rates")
+            cursor.execute("DELETE FROM employees")
+
     def _init_db(self) -> None:
-        """Инициализация базы данных."""
-        with sqlite3.connect(self.db_name) as conn:
+        """Инициализация базы данных.
+
+        Соединение работает без неявных транзакций: каждый шаг миграции вместе
+        с повышением user_version выполняется в явной транзакции. Внешние ключи
+        на время миграций отключены, так как старые схемы их не соблюдали, и
+        проверяются после завершения всех шагов.
+        """
+        conn = sqlite3.connect(self.db_name, isolation_level=None)
+        try:
             cursor = conn.cursor()
+            cursor.execute("PRAGMA foreign_keys = OFF")
+            cursor.execute("PRAGMA user_version")
+            version = cursor.fetchone()[0]
+            if self._table_exists(cursor, "works"):
+                migrations = (
+                    (1, self._migrate_to_fixed_point),
+                    (2, self._migrate_to_rate_history),
+                    (3, self._migrate_to_cascade),
+                )
+                for target_version, migrate in migrations:
+                    if version < target_version:
+                        self._run_migration(cursor, migrate, target_version)
+
+            cursor.execute("PRAGMA foreign_key_check")
+            violations = {row[0] for row in cursor.fetchall()}
+            if violations:
+                raise sqlite3.IntegrityError(f"Нарушены внешние ключи в таблицах: {', '.join(sorted(violations))}")
+
+            cursor.execute("BEGIN")
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS employees (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -32,8 +167,10 @@ class DatabaseManager:
             """)
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS work_rates (
-                    work_type TEXT PRIMARY KEY,
-                    rate REAL NOT NULL
+                    work_type TEXT NOT NULL,
+                    effective_from TEXT NOT NULL,
+                    rate_kopecks INTEGER NOT NULL,
+                    PRIMARY KEY (work_type, effective_from)
                 )
             """)
             cursor.execute("""
@@ -41,103 +178,460 @@ class DatabaseManager:
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     employee_id INTEGER,
                     work_type TEXT,
-                    hours REAL,
-                    FOREIGN KEY (employee_id) REFERENCES employees(id)
+                    minutes INTEGER NOT NULL,
+                    work_date TEXT NOT NULL,
+                    FOREIGN KEY (employee_id) REFERENCES employees(id) ON DELETE CASCADE
                 )
             """)
-            conn.commit()
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_works_employee_id ON works (employee_id)")
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    change_type TEXT NOT NULL,
+                    name TEXT,
+                    work_type TEXT,
+                    amount INTEGER,
+                    on_date TEXT
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+            cursor.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('database_id', ?)", (uuid.uuid4().hex,)
+            )
+            cursor.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('first_retained_seq', '1')")
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            cursor.execute("COMMIT")
+
+            # Режим auto_vacuum применяется к существующему файлу только после VACUUM
+            cursor.execute("PRAGMA auto_vacuum")
+            if cursor.fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+                cursor.execute(f"PRAGMA auto_vacuum = {AUTO_VACUUM_INCREMENTAL}")
+                cursor.execute("VACUUM")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _run_migration(cursor: sqlite3.Cursor, migrate: Callable[[sqlite3.Cursor], None], version: int) -> None:
+        """Выполнение шага миграции и повышение версии схемы в одной транзакции."""
+        cursor.execute("BEGIN")
+        try:
+            migrate(cursor)
+            cursor.execute(f"PRAGMA user_version = {version}")
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _table_exists(cursor: sqlite3.Cursor, table: str) -> bool:
+        """Проверка существования таблицы."""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        return cursor.fetchone() is not None
+
+    @staticmethod
+    def _migrate_to_fixed_point(cursor: sqlite3.Cursor) -> None:
+        """Перевод часов и ставок из REAL в целые минуты и копейки."""
+        cursor.execute("ALTER TABLE works RENAME TO works_v0")
+        cursor.execute("ALTER TABLE work_rates RENAME TO work_rates_v0")
+        cursor.execute("""
+            CREATE TABLE work_rates (
+                work_type TEXT PRIMARY KEY,
+                rate_kopecks INTEGER NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE works (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                employee_id INTEGER,
+                work_type TEXT,
+                minutes INTEGER NOT NULL,
+                FOREIGN KEY (employee_id) REFERENCES employees(id)
+            )
+        """)
+
+        cursor.execute("SELECT work_type, rate FROM work_rates_v0")
+        rates = [(work_type, rate_to_kopecks(rate)) for work_type, rate in cursor.fetchall()]
+        cursor.executemany("INSERT INTO work_rates (work_type, rate_kopecks) VALUES (?, ?)", rates)
+        cursor.execute("SELECT id, employee_id, work_type, hours FROM works_v0")
+        works = [
+            (work_id, employee_id, work_type, hours_to_minutes(hours))
+            for work_id, employee_id, work_type, hours in cursor.fetchall()
+        ]
+        cursor.executemany(
+            "INSERT INTO works (id, employee_id, work_type, minutes) VALUES (?, ?, ?, ?)", works
+        )
+
+        cursor.execute("DROP TABLE works_v0")
+        cursor.execute("DROP TABLE work_rates_v0")
+
+    @staticmethod
+    def _migrate_to_rate_history(cursor: sqlite3.Cursor) -> None:
+        """Перевод ставок в историю с датами начала действия и добавление дат работ.
+
+        Существующие ставки становятся базовыми (действуют с самого начала), а
+        существующие работы получают ту же дату date.min, поэтому ставки,
+        добавленные позже с датой начала действия, их не переоценивают.
+        """
+        cursor.execute("ALTER TABLE work_rates RENAME TO work_rates_v1")
+        cursor.execute("""
+            CREATE TABLE work_rates (
+                work_type TEXT NOT NULL,
+                effective_from TEXT NOT NULL,
+                rate_kopecks INTEGER NOT NULL,
+                PRIMARY KEY (work_type, effective_from)
+            )
+        """)
+        cursor.execute(
+            "INSERT INTO work_rates (work_type, effective_from, rate_kopecks) "
+            "SELECT work_type, ?, rate_kopecks FROM work_rates_v1",
+            (date.min.isoformat(),)
+        )
+        cursor.execute("DROP TABLE work_rates_v1")
+
+        cursor.execute("ALTER TABLE works RENAME TO works_v1")
+        cursor.execute("""
+            CREATE TABLE works (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                employee_id INTEGER,
+                work_type TEXT,
+                minutes INTEGER NOT NULL,
+                work_date TEXT NOT NULL,
+                FOREIGN KEY (employee_id) REFERENCES employees(id)
+            )
+        """)
+        cursor.execute(
+            "INSERT INTO works (id, employee_id, work_type, minutes, work_date) "
+            "SELECT id, employee_id, work_type, minutes, ? FROM works_v1",
+            (date.min.isoformat(),)
+        )
+        cursor.execute("DROP TABLE works_v1")
+
+        if DatabaseManager._table_exists(cursor, "changes"):
+            cursor.execute("ALTER TABLE changes ADD COLUMN on_date TEXT")
+
+    @staticmethod
+    def _migrate_to_cascade(cursor: sqlite3.Cursor) -> None:
+        """Пересоздание таблицы работ с каскадным удалением вместе с сотрудником.
+
+        Работы, оставшиеся без сотрудника, при переносе отбрасываются.
+        """
+        cursor.execute("ALTER TABLE works RENAME TO works_v2")
+        cursor.execute("""
+            CREATE TABLE works (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                employee_id INTEGER,
+                work_type TEXT,
+                minutes INTEGER NOT NULL,
+                work_date TEXT NOT NULL,
+                FOREIGN KEY (employee_id) REFERENCES employees(id) ON DELETE CASCADE
+            )
+        """)
+        cursor.execute("""
+            INSERT INTO works (id, employee_id, work_type, minutes, work_date)
+            SELECT id, employee_id, work_type, minutes, work_date FROM works_v2
+            WHERE employee_id IN (SELECT id FROM employees)
+        """)
+        cursor.execute("DROP TABLE works_v2")
+
+    def _log_changes(
+        self,
+        cursor: sqlite3.Cursor,
+        changes: list[tuple[ChangeType, str | None, WorkType | None, int | None, date | None]],
+    ) -> None:
+        """Запись изменений в журнал в рамках текущей транзакции.
+
+        Все записи в журнал идут через этот метод: он же помечает копию в памяти
+        устаревшей, так как она догоняет файл БД именно по журналу.
+        """
+        self._replica_stale = True
+        cursor.executemany(
+            "INSERT INTO changes (change_type, name, work_type, amount, on_date) VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    change_type.name,
+                    name,
+                    work_type.name if work_type else None,
+                    amount,
+                    on_date.isoformat() if on_date else None,
+                )
+                for change_type, name, work_type, amount, on_date in changes
+            ]
+        )
+
+    def _log_change(
+        self,
+        cursor: sqlite3.Cursor,
+        change_type: ChangeType,
+        name: str | None = None,
+        work_type: WorkType | None = None,
+        amount: int | None = None,
+        on_date: date | None = None,
+    ) -> None:
+        """Запись одного изменения в журнал в рамках текущей транзакции."""
+        self._log_changes(cursor, [(change_type, name, work_type, amount, on_date)])
 
     def add_employee(self, name: str) -> None:
         """Добавление сотрудника в БД."""
-        with sqlite3.connect(self.db_name) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("INSERT INTO employees (name) VALUES (?)", (name,))
+            self._log_change(cursor, ChangeType.EMPLOYEE_ADDED, name=name)
             conn.commit()
 
-    def add_work_rate(self, work_type: WorkType, rate: float) -> None:
-        """Добавление/обновление ставки за работу."""
-        with sqlite3.connect(self.db_name) as conn:
+    def add_work_rate(self, work_type: WorkType, rate: int, effective_from: date) -> None:
+        """Добавление/обновление ставки за работу (в копейках за час), действующей с указанной даты."""
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "INSERT OR REPLACE INTO work_rates (work_type, rate) VALUES (?, ?)",
-                (work_type.name, rate)
+                "INSERT OR REPLACE INTO work_rates (work_type, effective_from, rate_kopecks) VALUES (?, ?, ?)",
+                (work_type.name, effective_from.isoformat(), rate)
+            )
+            self._log_change(
+                cursor, ChangeType.RATE_CHANGED, work_type=work_type, amount=rate, on_date=effective_from
             )
             conn.commit()
 
-    def add_work(self, name: str, work_type: WorkType, hours: float) -> None:
+    def add_work(self, name: str, work: Work) -> None:
         """Добавление работы сотруднику."""
-        with sqlite3.connect(self.db_name) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT id FROM employees WHERE name = ?", (name,))
             employee_id = cursor.fetchone()[0]
             cursor.execute(
-                "INSERT INTO works (employee_id, work_type, hours) VALUES (?, ?, ?)",
-                (employee_id, work_type.name, hours)
+                "INSERT INTO works (employee_id, work_type, minutes, work_date) VALUES (?, ?, ?, ?)",
+                (employee_id, work.work_type.name, work.minutes, work.work_date.isoformat())
+            )
+            self._log_change(
+                cursor,
+                ChangeType.WORK_ADDED,
+                name=name,
+                work_type=work.work_type,
+                amount=work.minutes,
+                on_date=work.work_date,
             )
             conn.commit()
 
-    def get_employee_works(self, name: str) -> list[dict[WorkType, float]]:
-        """Получение работ конкретного сотрудника."""
-        with sqlite3.connect(self.db_name) as conn:
+    def get_employee_works(self, name: str) -> list[Work]:
+        """Получение работ конкретного сотрудника в порядке дат выполнения."""
+        with self._read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT w.work_type, w.hours 
+                SELECT w.work_type, w.minutes, w.work_date
                 FROM works w
                 JOIN employees e ON e.id = w.employee_id 
                 WHERE e.name = ?
+                ORDER BY w.work_date, w.id
             """, (name,))
 
             works = []
-            for work_type, hours in cursor.fetchall():
-                works.append({WorkType[work_type]: hours})
+            for work_type, minutes, work_date in cursor.fetchall():
+                works.append(Work(WorkType[work_type], minutes, date.fromisoformat(work_date)))
 
             return works
 
+    def get_minutes_by_type(
+        self, start: date | None = None, end: date | None = None
+    ) -> dict[str, dict[WorkType, int]]:
+        """Получение суммарных минут по типам работ для каждого сотрудника, при необходимости за период."""
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT e.name, w.work_type, SUM(w.minutes)
+                FROM employees e
+                LEFT JOIN works w ON w.employee_id = e.id
+                    AND (? IS NULL OR w.work_date >= ?)
+                    AND (? IS NULL OR w.work_date <= ?)
+                GROUP BY e.id, w.work_type
+            """, (
+                start and start.isoformat(), start and start.isoformat(),
+                end and end.isoformat(), end and end.isoformat(),
+            ))
+
+            minutes_by_type = {}
+            for name, work_type, minutes in cursor.fetchall():
+                employee_minutes = minutes_by_type.setdefault(name, {})
+                if work_type is not None:
+                    employee_minutes[WorkType[work_type]] = minutes
+            return minutes_by_type
+
+    def iter_minutes_by_type(self, chunk_size: int = 1000) -> Iterator[list[tuple[str, dict[WorkType, int]]]]:
+        """Потоковое получение суммарных минут по типам работ для сотрудников порциями по chunk_size."""
+        columns = ", ".join(
+            f"COALESCE(SUM(CASE WHEN w.work_type = '{work_type.name}' THEN w.minutes END), 0)"
+            for work_type in WorkType
+        )
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT e.name, {columns}
+                FROM employees e
+                LEFT JOIN works w ON w.employee_id = e.id
+                GROUP BY e.id
+                ORDER BY e.id
+            """)
+            while rows := cursor.fetchmany(chunk_size):
+                yield [(name, dict(zip(WorkType, minutes))) for name, *minutes in rows]
+
     def get_all_employees(self) -> list[str]:
         """Получение списка всех сотрудников."""
-        with sqlite3.connect(self.db_name) as conn:
+        with self._read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT name FROM employees")
             return [row[0] for row in cursor.fetchall()]
 
-    def get_all_work_rates(self) -> dict[WorkType, float]:
-        """Получение всех ставок за работу."""
-        with sqlite3.connect(self.db_name) as conn:
+    def get_rate_history(self) -> dict[WorkType, list[tuple[date, int]]]:
+        """Получение истории ставок за работу (дата начала действия, ставка в копейках за час)."""
+        with self._read_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT work_type, rate FROM work_rates")
-            return {WorkType[wt]: rate for wt, rate in cursor.fetchall()}
+            cursor.execute("SELECT work_type, effective_from, rate_kopecks FROM work_rates ORDER BY effective_from")
+            history = {}
+            for work_type, effective_from, rate in cursor.fetchall():
+                history.setdefault(WorkType[work_type], []).append((date.fromisoformat(effective_from), rate))
+            return history
 
     def clear_employees_and_works(self) -> None:
         """Очистка только сотрудников и их работ из БД."""
-        with sqlite3.connect(self.db_name) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM works")
             cursor.execute("DELETE FROM employees")
+            self._log_change(cursor, ChangeType.EMPLOYEES_CLEARED)
             conn.commit()
+            self._release_free_pages(cursor)
 
     def clear_database(self) -> None:
         """Очистка всех таблиц в базе данных."""
-        with sqlite3.connect(self.db_name) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM works")
             cursor.execute("DELETE FROM work_rates")
             cursor.execute("DELETE FROM employees")
+            self._log_change(cursor, ChangeType.DATA_CLEARED)
             conn.commit()
+            self._release_free_pages(cursor)
 
     def delete_employee(self, name: str) -> None:
         """Удаление сотрудника и всех его работ из БД."""
-        with sqlite3.connect(self.db_name) as conn:
+        self.delete_employees([name])
+
+    def delete_employees(self, names: list[str]) -> None:
+        """Удаление нескольких сотрудников и всех их работ из БД одной транзакцией."""
+        names = list(dict.fromkeys(names))
+        with self._connect() as conn:
             cursor = conn.cursor()
             try:
-                cursor.execute("SELECT id FROM employees WHERE name = ?", (name,))
-                employee_id = cursor.fetchone()
-
-                if employee_id:
-                    employee_id = employee_id[0]
-                    cursor.execute("DELETE FROM works WHERE employee_id = ?", (employee_id,))
-                    cursor.execute("DELETE FROM employees WHERE id = ?", (employee_id,))
+                existing = set()
+                for i in range(0, len(names), QUERY_CHUNK_SIZE):
+                    chunk = names[i:i + QUERY_CHUNK_SIZE]
+                    placeholders = ", ".join("?" * len(chunk))
+                    cursor.execute(f"SELECT name FROM employees WHERE name IN ({placeholders})", chunk)
+                    existing.update(row[0] for row in cursor.fetchall())
 
+                self._log_changes(
+                    cursor,
+                    [(ChangeType.EMPLOYEE_DELETED, name, None, None, None) for name in names if name in existing]
+                )
+                cursor.executemany("DELETE FROM employees WHERE name = ?", [(name,) for name in names])
                 conn.commit()
             except sqlite3.Error as e:
                 conn.rollback()
-                raise Exception(f"Ошибка при удалении сотрудника: {e}")
+                raise Exception(f"Ошибка при удалении сотрудников: {e}")
+            self._release_free_pages(cursor)
+
+    @staticmethod
+    def _release_free_pages(cursor: sqlite3.Cursor) -> None:
+        """Возврат свободных страниц файловой системе (инкрементальный VACUUM).
+
+        Прагма освобождает по одной странице за шаг выполнения, а execute делает
+        только один шаг, поэтому она запускается через executescript.
+        """
+        cursor.executescript("PRAGMA incremental_vacuum;")
+
+    def vacuum(self) -> None:
+        """Полное сжатие файла БД с дефрагментацией."""
+        with self._connect() as conn:
+            conn.execute("VACUUM")
+
+    @staticmethod
+    def _get_token(cursor: sqlite3.Cursor) -> int:
+        """Получение номера последней записи журнала изменений."""
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'")
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def get_change_token(self) -> int:
+        """Получение токена последнего изменения (номер последней записи журнала)."""
+        with self._connect() as conn:
+            return self._get_token(conn.cursor())
+
+    def get_database_id(self) -> str:
+        """Получение идентификатора БД, к которому привязаны токены журнала изменений."""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM meta WHERE key = 'database_id'")
+            return cursor.fetchone()[0]
+
+    @staticmethod
+    def _get_first_retained_seq(cursor: sqlite3.Cursor) -> int:
+        """Получение номера первой записи, оставшейся в журнале изменений после очистки."""
+        cursor.execute("SELECT value FROM meta WHERE key = 'first_retained_seq'")
+        return int(cursor.fetchone()[0])
+
+    def prune_changes(self, up_to_token: int) -> None:
+        """Удаление из журнала изменений записей с номерами до up_to_token включительно.
+
+        Номер первой оставшейся записи сохраняется в meta, чтобы выгрузка изменений
+        от более старых токенов завершалась ошибкой, а не отдавала неполный набор.
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            if not (0 <= up_to_token <= self._get_token(cursor)):
+                raise ValueError(f"Неизвестный токен изменений: {up_to_token}")
+            cursor.execute("DELETE FROM changes WHERE seq <= ?", (up_to_token,))
+            cursor.execute(
+                "UPDATE meta SET value = MAX(CAST(value AS INTEGER), ?) WHERE key = 'first_retained_seq'",
+                (up_to_token + 1,)
+            )
+            conn.commit()
+            self._release_free_pages(cursor)
+        # Копия в памяти догоняет файл по журналу, поэтому после очистки загружается заново
+        self.refresh_replica()
+
+    def get_changes_since(
+        self, token: int, database_id: str
+    ) -> list[tuple[int, ChangeType, str | None, WorkType | None, int | None, date | None]]:
+        """Получение изменений, сделанных после указанного токена этой БД, в порядке их записи."""
+        if database_id != self.get_database_id():
+            raise ValueError("Токен изменений относится к другой базе данных")
+        if not (0 <= token <= self.get_change_token()):
+            raise ValueError(f"Неизвестный токен изменений: {token}")
+        with self._connect() as conn:
+            first_retained_seq = self._get_first_retained_seq(conn.cursor())
+        # Для токена нужны все записи с номерами больше него
+        if token + 1 < first_retained_seq:
+            raise ValueError(
+                f"Изменения после токена {token} удалены из журнала (хранятся начиная с {first_retained_seq}); "
+                f"сохраните полный снимок данных"
+            )
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT seq, change_type, name, work_type, amount, on_date FROM changes WHERE seq > ? ORDER BY seq",
+                (token,)
+            )
+            return [
+                (
+                    seq,
+                    ChangeType[change_type],
+                    name,
+                    WorkType[work_type] if work_type else None,
+                    amount,
+                    date.fromisoformat(on_date) if on_date else None,
+                )
+                for seq, change_type, name, work_type, amount, on_date in cursor.fetchall()
+            ]
@@ -1,4 +1,8 @@
+from datetime import date
+
 from models.database import DatabaseManager
+from models.rate_timeline import RateTimeline
+from models.work import Work
 from models.work_type import WorkType
 from models.salary_strategy import SalaryCalculationStrategy, StandardSalaryStrategy
 
@@ -17,14 +21,21 @@ class Employee:
         self.db_manager = db_manager
         self.salary_strategy = salary_strategy
 
-    def add_work(self, work_type: WorkType, hours: float) -> None:
-        """Добавление работы сотруднику."""
-        self.db_manager.add_work(self.name, work_type, hours)
-        self.works.append({work_type: hours})
+    def add_work(self, work_type: WorkType, minutes: int, work_date: date) -> None:
+        """Добавление работы сотруднику (длительность в минутах)."""
+        work = Work(work_type, minutes, work_date)
+        self.db_manager.add_work(self.name, work)
+        self.works.append(work)
 
-    def calculate_salary(self, rates: dict[WorkType, float]) -> float:
-        """Расчет зарплаты сотрудника."""
-        return self.salary_strategy.calculate(self.works, rates)
+    def calculate_salary(self, rates: RateTimeline, start: date | None = None, end: date | None = None) -> int:
+        """Расчет зарплаты сотрудника в копейках, при необходимости только за период [start, end]."""
+        works = self.works
+        if start or end:
+            works = [
+                work for work in works
+                if (not start or work.work_date >= start) and (not end or work.work_date <= end)
+            ]
+        return self.salary_strategy.calculate(works, rates)
 
     def set_salary_strategy(self, strategy: SalaryCalculationStrategy) -> None:
         """Установление стратегии по расчету зарплаты."""
@@ -0,0 +1,40 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+MINUTES_PER_HOUR = 60
+KOPECKS_PER_RUBLE = 100
+
+
+def round_div(numerator: int, denominator: int) -> int:
+    """Целочисленное деление с округлением половины от нуля."""
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if remainder * 2 >= denominator:
+        quotient += 1
+    return quotient if numerator >= 0 else -quotient
+
+
+def _to_scaled(value: float | str, scale: int) -> int:
+    """Перевод числа во внешнем представлении в целое число единиц с масштабом scale."""
+    try:
+        number = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f"Значение '{value}' должно быть числом") from None
+    if not number.is_finite():
+        raise ValueError(f"Значение '{value}' должно быть конечным числом")
+    return int((number * scale).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def hours_to_minutes(hours: float | str) -> int:
+    """Перевод часов (число или строка) в целое количество минут."""
+    return _to_scaled(hours, MINUTES_PER_HOUR)
+
+
+def rate_to_kopecks(rate: float | str) -> int:
+    """Перевод ставки в рублях (число или строка) в целое количество копеек."""
+    return _to_scaled(rate, KOPECKS_PER_RUBLE)
+
+
+def format_money(kopecks: int) -> str:
+    """Форматирование суммы в копейках в виде строки '123.45' без потери точности."""
+    sign = "-" if kopecks < 0 else ""
+    rubles, rest = divmod(abs(kopecks), KOPECKS_PER_RUBLE)
+    return f"{sign}{rubles}.{rest:02d}"
@@ -1,7 +1,12 @@
+from datetime import date
 import sqlite3
 
+from models.change_event import ChangeEvent, ChangePublisher
+from models.change_type import ChangeType
 from models.database import DatabaseManager
 from models.employee import Employee
+from models.money import KOPECKS_PER_RUBLE, MINUTES_PER_HOUR
+from models.rate_timeline import RateTimeline
 from models.work_type import WorkType
 
 
@@ -18,14 +23,15 @@ class PayrollDepartment:
 
     def __init__(self) -> None:
         self.employees = {}
-        self.work_rates = {}
+        self.rate_timeline = RateTimeline()
         self.db_manager = DatabaseManager()
+        self.events = ChangePublisher()
         self._load_data()
 
     def _load_data(self) -> None:
         """Загрузка данных из БД при инициализации."""
         try:
-            self.work_rates = self.db_manager.get_all_work_rates()
+            self.rate_timeline = RateTimeline(self.db_manager.get_rate_history())
             employee_names = self.db_manager.get_all_employees()
             for name in employee_names:
                 self.employees[name] = Employee(name=name, db_manager=self.db_manager)
@@ -41,6 +47,7 @@ class PayrollDepartment:
             raise ValueError(f"Сотрудник '{name}' уже существует")
         self.db_manager.add_employee(name)
         self.employees.update({name: Employee(name, self.db_manager)})
+        self.events.publish(ChangeEvent(ChangeType.EMPLOYEE_ADDED, name))
 
     def delete_employee(self, name: str) -> None:
         """Удаление работника в БД отдела расчета зарплат."""
@@ -48,39 +55,128 @@ class PayrollDepartment:
             raise KeyError(f"Сотрудник '{name}' не существует")
         self.db_manager.delete_employee(name)
         self.employees.pop(name)
-
-    def add_work_rate(self, work_type: WorkType, rate: float) -> None:
-        """Изменение часовой ставки за определенный тип работы."""
-        if not rate or not (0 < rate < 1_000_000):
+        self.events.publish(ChangeEvent(ChangeType.EMPLOYEE_DELETED, name))
+
+    def delete_employees(self, names: list[str]) -> None:
+        """Удаление нескольких работников одной транзакцией в БД отдела расчета зарплат."""
+        missing = [name for name in names if name not in self.employees]
+        if missing:
+            raise KeyError(f"Сотрудники не существуют: {', '.join(missing)}")
+        self.db_manager.delete_employees(names)
+        with self.events.batch():
+            for name in names:
+                if self.employees.pop(name, None) is not None:
+                    self.events.publish(ChangeEvent(ChangeType.EMPLOYEE_DELETED, name))
+
+    def add_work_rate(self, work_type: WorkType, rate: int, effective_from: date | None = None) -> None:
+        """Изменение часовой ставки (в копейках) за определенный тип работы.
+
+        Ставка действует с effective_from; без даты задается базовая ставка,
+        действующая с самого начала.
+        """
+        if not isinstance(rate, int) or not (0 < rate < 1_000_000 * KOPECKS_PER_RUBLE):
             raise ValueError("Ставка должна быть положительным числом и меньше 1.000.000")
-        self.db_manager.add_work_rate(work_type, rate)
-        self.work_rates[work_type] = rate
+        effective_from = effective_from or date.min
+        self.db_manager.add_work_rate(work_type, rate, effective_from)
+        self.rate_timeline.set_rate(work_type, effective_from, rate)
+        self.events.publish(ChangeEvent(ChangeType.RATE_CHANGED, work_type=work_type))
 
-    def add_work(self, name: str, work_type: WorkType, hours: float) -> None:
-        """Добавление работы сотруднику."""
+    def add_work(self, name: str, work_type: WorkType, minutes: int, work_date: date | None = None) -> None:
+        """Добавление работы сотруднику (длительность в минутах, по умолчанию выполненной сегодня)."""
         if name not in self.employees:
             raise KeyError(f"Сотрудника '{name}' не существует")
-        if not hours or not (0 < hours < 1_000):
+        if not isinstance(minutes, int) or not (0 < minutes < 1_000 * MINUTES_PER_HOUR):
             raise ValueError("Количество часов должно быть положительным числом и меньше 1.000")
-        if work_type not in self.work_rates:
-            raise ValueError(f"Добавьте ставку для '{work_type}'")
-        self.employees[name].add_work(work_type, hours)
-
-    def get_employee_salary(self, name: str) -> float:
-        """Вычисление зарплаты определенного сотрудника."""
-        return self.employees[name].calculate_salary(self.work_rates) if name in self.employees else 0
-
-    def get_total_payroll(self) -> float:
-        """Вычисление зарплат всех сотрудников."""
-        return sum(employee.calculate_salary(self.work_rates) for employee in self.employees.values())
+        work_date = work_date or date.today()
+        if not self.rate_timeline.has_rate(work_type, work_date):
+            raise ValueError(f"Добавьте ставку для '{work_type}' на {work_date.isoformat()}")
+        self.employees[name].add_work(work_type, minutes, work_date)
+        self.events.publish(ChangeEvent(ChangeType.WORK_ADDED, name, work_type))
+
+    def get_employee_salary(self, name: str, start: date | None = None, end: date | None = None) -> int:
+        """Вычисление зарплаты определенного сотрудника в копейках, при необходимости за период."""
+        if name not in self.employees:
+            return 0
+        return self.employees[name].calculate_salary(self.rate_timeline, start, end)
+
+    def get_total_payroll(self, start: date | None = None, end: date | None = None) -> int:
+        """Вычисление зарплат всех сотрудников в копейках, при необходимости за период."""
+        return sum(
+            employee.calculate_salary(self.rate_timeline, start, end) for employee in self.employees.values()
+        )
+
+    def simulate_payroll(
+        self,
+        rate_scenarios: list[dict[WorkType, int]],
+        start: date | None = None,
+        end: date | None = None,
+    ) -> tuple[dict[str, list[int]], list[int]]:
+        """Расчет зарплат для набора вариантов ставок без изменения текущих ставок и БД.
+
+        Минуты по типам работ суммируются в БД один раз, после чего каждый вариант
+        ставок (в копейках за час) применяется к этим суммам. Запрос к БД общий,
+        но арифметика выполняется для каждого варианта: 100 вариантов обходятся
+        примерно на порядок дороже одного get_total_payroll (а не в 100 раз).
+        Расчет ведется по сотрудникам модели; записи БД, которых нет в модели,
+        не учитываются. Возвращает зарплаты каждого сотрудника и общий фонд по
+        каждому варианту в копейках.
+        """
+        for rates in rate_scenarios:
+            if any(not isinstance(rate, int) or rate < 0 for rate in rates.values()):
+                raise ValueError("Ставки в вариантах должны быть неотрицательными целыми числами (копейки)")
+
+        db_minutes = self.db_manager.get_minutes_by_type(start, end)
+        minutes_matrix = {name: db_minutes.get(name, {}) for name in self.employees}
+        used_types = {work_type for minutes_by_type in minutes_matrix.values() for work_type in minutes_by_type}
+        for index, rates in enumerate(rate_scenarios):
+            missing = sorted(work_type.name for work_type in used_types - rates.keys())
+            if missing:
+                raise ValueError(f"В варианте ставок №{index + 1} нет ставок для: {', '.join(missing)}")
+
+        salaries = {}
+        for name, employee in self.employees.items():
+            salaries[name] = employee.salary_strategy.calculate_scenarios(minutes_matrix[name], rate_scenarios)
+
+        totals = [sum(column) for column in zip(*salaries.values())] if salaries else [0] * len(rate_scenarios)
+        return salaries, totals
 
     def clear_all_employees(self) -> None:
         """Удаление всех сотрудников из системы и БД, сохраняя ставки."""
         self.db_manager.clear_employees_and_works()
         self.employees.clear()
+        self.events.publish(ChangeEvent(ChangeType.EMPLOYEES_CLEARED))
 
     def clear_data(self) -> None:
         """Очистка всех данных."""
         self.db_manager.clear_database()
         self.employees.clear()
-        self.work_rates.clear()
+        self.rate_timeline.clear()
+        self.events.publish(ChangeEvent(ChangeType.DATA_CLEARED))
+
+    def compact_database(self) -> None:
+        """Сжатие файла БД после массовых удалений.
+
+        Журнал изменений очищается до текущего токена, иначе VACUUM не может
+        вернуть занятое им место; изменения от ранее сохраненных снимков после
+        этого не выгружаются, нужен новый полный снимок.
+        """
+        self.db_manager.prune_changes(self.db_manager.get_change_token())
+        self.db_manager.vacuum()
+
+    def prune_change_log(self, up_to_token: int) -> None:
+        """Удаление из журнала изменений, сделанных до указанного токена включительно."""
+        self.db_manager.prune_changes(up_to_token)
+
+    def get_change_token(self) -> int:
+        """Получение токена текущего состояния данных для последующей выгрузки изменений."""
+        return self.db_manager.get_change_token()
+
+    def get_database_id(self) -> str:
+        """Получение идентификатора БД, к которому привязаны токены изменений."""
+        return self.db_manager.get_database_id()
+
+    def get_changes_since(
+        self, token: int, database_id: str
+    ) -> list[tuple[int, ChangeType, str | None, WorkType | None, int | None, date | None]]:
+        """Получение изменений, сделанных после указанного токена БД database_id."""
+        return self.db_manager.get_changes_since(token, database_id)
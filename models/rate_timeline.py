@@ -0,0 +1,85 @@
+from bisect import bisect_right, insort
+from datetime import date
+
+from models.work import Work
+from models.work_type import WorkType
+
+
+class RateTimeline:
+    """Класс представляет собой историю ставок с датами начала действия.
+
+    Для каждого типа работы хранятся отсортированные даты начала действия и
+    соответствующие им ставки в копейках, поэтому ставка на дату находится
+    двоичным поиском, а отсортированный по датам список работ — одним проходом.
+    """
+
+    def __init__(self, history: dict[WorkType, list[tuple[date, int]]] | None = None) -> None:
+        self._dates: dict[WorkType, list[date]] = {}
+        self._rates: dict[WorkType, list[int]] = {}
+        for work_type, entries in (history or {}).items():
+            for effective_from, rate in entries:
+                self.set_rate(work_type, effective_from, rate)
+
+    def set_rate(self, work_type: WorkType, effective_from: date, rate: int) -> None:
+        """Установка ставки, действующей с указанной даты."""
+        dates = self._dates.setdefault(work_type, [])
+        rates = self._rates.setdefault(work_type, [])
+        index = bisect_right(dates, effective_from)
+        if index and dates[index - 1] == effective_from:
+            rates[index - 1] = rate
+        else:
+            dates.insert(index, effective_from)
+            rates.insert(index, rate)
+
+    def has_rate(self, work_type: WorkType, day: date) -> bool:
+        """Проверка наличия ставки на указанную дату."""
+        dates = self._dates.get(work_type)
+        return bool(dates) and dates[0] <= day
+
+    def rate_at(self, work_type: WorkType, day: date) -> int:
+        """Получение ставки, действующей на указанную дату."""
+        if not self.has_rate(work_type, day):
+            raise KeyError(f"Нет ставки для '{work_type.name}' на {day.isoformat()}")
+        return self._rates[work_type][bisect_right(self._dates[work_type], day) - 1]
+
+    def rates_for(self, works: list[Work]) -> list[int]:
+        """Получение ставок для списка работ.
+
+        Для работ, идущих по возрастанию дат, поиск продолжается с позиции
+        предыдущей работы того же типа, так что проход по списку линеен.
+        """
+        positions = dict.fromkeys(self._dates, 0)
+        result = []
+        for work in works:
+            if not self.has_rate(work.work_type, work.work_date):
+                raise KeyError(f"Нет ставки для '{work.work_type.name}' на {work.work_date.isoformat()}")
+            dates = self._dates[work.work_type]
+            index = positions[work.work_type]
+            if index and dates[index - 1] > work.work_date:
+                index = 0
+            index = bisect_right(dates, work.work_date, lo=index)
+            positions[work.work_type] = index
+            result.append(self._rates[work.work_type][index - 1])
+        return result
+
+    def current_rates(self) -> dict[WorkType, int]:
+        """Получение последних установленных ставок по каждому типу работы."""
+        return {work_type: rates[-1] for work_type, rates in self._rates.items()}
+
+    def history(self) -> dict[WorkType, list[tuple[date, int]]]:
+        """Получение полной истории ставок по каждому типу работы."""
+        return {
+            work_type: list(zip(self._dates[work_type], rates))
+            for work_type, rates in self._rates.items()
+        }
+
+    def clear(self) -> None:
+        """Очистка истории ставок."""
+        self._dates.clear()
+        self._rates.clear()
+
+    def __contains__(self, work_type: WorkType) -> bool:
+        return work_type in self._dates
+
+    def __bool__(self) -> bool:
+        return bool(self._dates)
@@ -0,0 +1,82 @@
+from typing import Any, Iterator
+import csv
+import gzip
+
+from models.payroll import PayrollDepartment
+from models.work_type import WorkType
+
+REPORT_COLUMNS = ["name", "salary_kopecks"] + [f"{work_type.name.lower()}_minutes" for work_type in WorkType]
+
+
+def _iter_report_rows(payroll: PayrollDepartment, chunk_size: int) -> Iterator[list[list]]:
+    """Потоковое получение строк отчета порциями: имя, зарплата и минуты по типам работ.
+
+    Минуты берутся из SQL-агрегата, а зарплата рассчитывается моделью через
+    payroll.get_employee_salary, чтобы учитывать историю ставок и стратегию расчета.
+    """
+    for chunk in payroll.db_manager.iter_minutes_by_type(chunk_size):
+        yield [
+            [name, payroll.get_employee_salary(name)] + [minutes[work_type] for work_type in WorkType]
+            for name, minutes in chunk
+        ]
+
+
+def _open_csv(filename: str, mode: str):
+    """Открытие CSV файла, сжатого gzip при расширении .gz."""
+    if filename.endswith(".gz"):
+        return gzip.open(filename, mode + "t", encoding="utf-8", newline="")
+    return open(filename, mode, encoding="utf-8", newline="")
+
+
+def _import_pyarrow() -> tuple[Any, Any]:
+    """Импорт pyarrow для работы с Parquet."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Для формата Parquet требуется пакет pyarrow; используйте формат CSV.gz") from None
+    return pyarrow, pyarrow.parquet
+
+
+def export_report(payroll: PayrollDepartment, filename: str, chunk_size: int = 1000) -> int:
+    """Выгрузка плоского отчета по сотрудникам в CSV(.gz) или Parquet по расширению файла.
+
+    Суммы выгружаются в копейках, длительности — в минутах. Зарплата каждого
+    сотрудника рассчитывается моделью, минуты — агрегатом БД. Возвращает число строк.
+    """
+    count = 0
+    if filename.endswith(".parquet"):
+        pyarrow, parquet = _import_pyarrow()
+        schema = pyarrow.schema(
+            [("name", pyarrow.string())] + [(column, pyarrow.int64()) for column in REPORT_COLUMNS[1:]]
+        )
+        with parquet.ParquetWriter(filename, schema, compression="zstd") as writer:
+            for rows in _iter_report_rows(payroll, chunk_size):
+                writer.write_table(pyarrow.Table.from_arrays([list(col) for col in zip(*rows)], schema=schema))
+                count += len(rows)
+        return count
+
+    with _open_csv(filename, "w") as f:
+        writer = csv.writer(f)
+        writer.writerow(REPORT_COLUMNS)
+        for rows in _iter_report_rows(payroll, chunk_size):
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def read_report(filename: str) -> dict[str, list]:
+    """Чтение отчета в виде столбцов: имя столбца -> список значений."""
+    if filename.endswith(".parquet"):
+        _, parquet = _import_pyarrow()
+        return parquet.read_table(filename).to_pydict()
+
+    with _open_csv(filename, "r") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        columns = list(zip(*reader)) or [()] * len(header)
+
+    return {
+        column: list(values) if column == "name" else list(map(int, values))
+        for column, values in zip(header, columns)
+    }
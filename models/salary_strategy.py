@@ -1,34 +1,84 @@
 from abc import ABC, abstractmethod
+from datetime import date
 
+from models.money import MINUTES_PER_HOUR, round_div
+from models.rate_timeline import RateTimeline
+from models.work import Work
 from models.work_type import WorkType
 
 
 class SalaryCalculationStrategy(ABC):
-    """Абстрактный класс для стратегии расчета зарплаты."""
+    """Абстрактный класс для стратегии расчета зарплаты.
+
+    Длительность работ задана в минутах, ставки — в копейках за час и берутся
+    из истории на дату каждой работы, результат — в копейках. Округление
+    выполняется один раз для итоговой суммы сотрудника.
+    """
 
     @abstractmethod
-    def calculate(self, works: list[dict[WorkType, float]], rates: dict[WorkType, float]) -> float:
+    def calculate(self, works: list[Work], rates: RateTimeline) -> int:
         """Расчет зарплаты по конкретной стратегии."""
         pass
 
+    def calculate_scenarios(
+        self, minutes_by_type: dict[WorkType, int], rate_scenarios: list[dict[WorkType, int]]
+    ) -> list[int]:
+        """Расчет зарплаты по суммарным минутам каждого типа работы для набора вариантов ставок.
+
+        Реализация по умолчанию сводит работы каждого типа в одну и вызывает calculate
+        для каждого варианта, что верно для стратегий, линейных по часам.
+        """
+        works = [Work(work_type, minutes, date.min) for work_type, minutes in minutes_by_type.items()]
+        return [
+            self.calculate(works, RateTimeline({wt: [(date.min, rate)] for wt, rate in rates.items()}))
+            for rates in rate_scenarios
+        ]
+
 
 class StandardSalaryStrategy(SalaryCalculationStrategy):
     """Стандартная стратегия расчета зарплаты."""
 
-    def calculate(self, works: list[dict[WorkType, float]], rates: dict[WorkType, float]) -> float:
-        return sum(hours * rates[work_type] for work in works for work_type, hours in work.items())
+    def calculate(self, works: list[Work], rates: RateTimeline) -> int:
+        total = sum(work.minutes * rate for work, rate in zip(works, rates.rates_for(works)))
+        return round_div(total, MINUTES_PER_HOUR)
+
+    def calculate_scenarios(
+        self, minutes_by_type: dict[WorkType, int], rate_scenarios: list[dict[WorkType, int]]
+    ) -> list[int]:
+        items = list(minutes_by_type.items())
+        return [
+            round_div(sum(minutes * rates[work_type] for work_type, minutes in items), MINUTES_PER_HOUR)
+            for rates in rate_scenarios
+        ]
 
 
 class OvertimeBonusStrategy(SalaryCalculationStrategy):
-    """Стратегия расчета зарплаты с повышенной ставкой за переработку."""
+    """Стратегия расчета зарплаты с повышенной ставкой (x1.5) за переработку."""
+
+    OVERTIME_NUMERATOR = 3
+    OVERTIME_DENOMINATOR = 2
 
-    def calculate(self, works: list[dict[WorkType, float]], rates: dict[WorkType, float]) -> float:
+    def calculate(self, works: list[Work], rates: RateTimeline) -> int:
         total = 0
-        for work in works:
-            for work_type, hours in work.items():
-                rate = rates[work_type]
-                if work_type == WorkType.OVERTIME:
-                    total += hours * rate * 1.5
-                else:
-                    total += hours * rate
-        return total
+        for work, rate in zip(works, rates.rates_for(works)):
+            if work.work_type == WorkType.OVERTIME:
+                total += work.minutes * rate * self.OVERTIME_NUMERATOR
+            else:
+                total += work.minutes * rate * self.OVERTIME_DENOMINATOR
+        return round_div(total, MINUTES_PER_HOUR * self.OVERTIME_DENOMINATOR)
+
+    def calculate_scenarios(
+        self, minutes_by_type: dict[WorkType, int], rate_scenarios: list[dict[WorkType, int]]
+    ) -> list[int]:
+        weighted = [
+            (
+                work_type,
+                minutes * (self.OVERTIME_NUMERATOR if work_type == WorkType.OVERTIME else self.OVERTIME_DENOMINATOR),
+            )
+            for work_type, minutes in minutes_by_type.items()
+        ]
+        denominator = MINUTES_PER_HOUR * self.OVERTIME_DENOMINATOR
+        return [
+            round_div(sum(minutes * rates[work_type] for work_type, minutes in weighted), denominator)
+            for rates in rate_scenarios
+        ]
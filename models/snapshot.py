@@ -0,0 +1,152 @@
+from datetime import date
+from typing import Any
+
+from models.change_type import ChangeType
+from models.money import hours_to_minutes, rate_to_kopecks
+from models.work_type import WorkType
+
+# Версия 2: длительности в целых минутах, ставки в целых копейках.
+# Файлы без версии хранят часы и ставки дробными числами и читаются с переводом.
+SNAPSHOT_FORMAT_VERSION = 2
+
+
+def build_delta(
+    changes: list[tuple[int, ChangeType, str | None, WorkType | None, int | None, date | None]],
+    database_id: str,
+    base_token: int,
+    token: int,
+) -> dict[str, Any]:
+    """Подготовка файла изменений между двумя токенами для сохранения."""
+    records = []
+    for _, change_type, name, work_type, amount, on_date in changes:
+        record: dict[str, Any] = {"type": change_type.name}
+        if name is not None:
+            record["name"] = name
+        if work_type is not None:
+            record["work_type"] = work_type.name
+        if change_type == ChangeType.WORK_ADDED:
+            record["minutes"] = amount
+            record["date"] = on_date.isoformat()
+        elif change_type == ChangeType.RATE_CHANGED:
+            record["effective_from"] = on_date.isoformat()
+            record["rate_kopecks"] = amount
+        records.append(record)
+
+    return {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "database_id": database_id,
+        "base_token": base_token,
+        "token": token,
+        "changes": records,
+    }
+
+
+def is_delta(data: dict[str, Any]) -> bool:
+    """Проверка, является ли содержимое файла набором изменений, а не полным снимком."""
+    return "changes" in data
+
+
+def _minutes(record: dict[str, Any]) -> int:
+    """Длительность работы из записи файла: целые минуты или часы старого формата."""
+    return record["minutes"] if "minutes" in record else hours_to_minutes(record["hours"])
+
+
+def _rate_kopecks(record: dict[str, Any]) -> int:
+    """Ставка из записи файла: целые копейки или рубли старого формата."""
+    return record["rate_kopecks"] if "rate_kopecks" in record else rate_to_kopecks(record["rate"])
+
+
+def normalize_snapshot(data: dict[str, Any]) -> dict[str, Any]:
+    """Приведение снимка старого формата к текущему.
+
+    Часы и ставки переводятся в минуты и копейки. Ставки без даты становятся
+    базовыми, а работы без даты получают ту же дату date.min, что и при
+    миграции БД, поэтому результат не зависит от дня загрузки.
+    """
+    undated = date.min.isoformat()
+    employees = {}
+    for name, employee_data in data["employees"].items():
+        works = []
+        for work in employee_data["works"]:
+            if "work_type" in work:
+                works.append({"work_type": work["work_type"], "minutes": _minutes(work), "date": work["date"]})
+            else:
+                works.extend(
+                    {"work_type": wt, "minutes": hours_to_minutes(hours), "date": undated} for wt, hours in work.items()
+                )
+        employees[name] = {"works": works}
+
+    work_rates = {}
+    for work_type, entries in data["work_rates"].items():
+        if not isinstance(entries, list):
+            entries = [{"effective_from": date.min.isoformat(), "rate": entries}]
+        work_rates[work_type] = [
+            {"effective_from": entry["effective_from"], "rate_kopecks": _rate_kopecks(entry)} for entry in entries
+        ]
+
+    normalized = {"format_version": SNAPSHOT_FORMAT_VERSION, "employees": employees, "work_rates": work_rates}
+    for key in ("database_id", "token"):
+        if key in data:
+            normalized[key] = data[key]
+    return normalized
+
+
+def apply_delta(snapshot: dict[str, Any], delta: dict[str, Any]) -> dict[str, Any]:
+    """Применение набора изменений к снимку данных с получением нового снимка.
+
+    Токены имеют смысл только внутри одной БД, поэтому снимок и изменения
+    должны иметь одинаковый database_id.
+    """
+    if snapshot.get("database_id") != delta["database_id"]:
+        raise ValueError("Изменения выгружены из другой базы данных, чем снимок")
+    if snapshot.get("token") != delta["base_token"]:
+        raise ValueError(
+            f"Изменения построены от токена {delta['base_token']}, а снимок имеет токен {snapshot.get('token')}"
+        )
+
+    snapshot = normalize_snapshot(snapshot)
+    employees = snapshot["employees"]
+    work_rates = snapshot["work_rates"]
+
+    for record in delta["changes"]:
+        change_type = ChangeType[record["type"]]
+        if change_type == ChangeType.EMPLOYEE_ADDED:
+            employees[record["name"]] = {"works": []}
+        elif change_type == ChangeType.EMPLOYEE_DELETED:
+            employees.pop(record["name"], None)
+        elif change_type == ChangeType.WORK_ADDED:
+            employees[record["name"]]["works"].append(
+                {"work_type": record["work_type"], "minutes": _minutes(record), "date": record["date"]}
+            )
+        elif change_type == ChangeType.RATE_CHANGED:
+            entries = [
+                entry for entry in work_rates.get(record["work_type"], [])
+                if entry["effective_from"] != record["effective_from"]
+            ]
+            entries.append({"effective_from": record["effective_from"], "rate_kopecks": _rate_kopecks(record)})
+            work_rates[record["work_type"]] = sorted(entries, key=lambda entry: entry["effective_from"])
+        elif change_type == ChangeType.EMPLOYEES_CLEARED:
+            employees.clear()
+        elif change_type == ChangeType.DATA_CLEARED:
+            employees.clear()
+            work_rates.clear()
+
+    return {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "employees": employees,
+        "work_rates": work_rates,
+        "database_id": delta["database_id"],
+        "token": delta["token"],
+    }
+
+
+def merge_snapshot_with_deltas(files_data: list[dict[str, Any]]) -> dict[str, Any]:
+    """Сборка итогового снимка из одного полного снимка и произвольного числа наборов изменений."""
+    snapshots = [data for data in files_data if not is_delta(data)]
+    if len(snapshots) != 1:
+        raise ValueError("Выберите ровно один файл с полным снимком данных")
+
+    snapshot = normalize_snapshot(snapshots[0])
+    for delta in sorted((data for data in files_data if is_delta(data)), key=lambda d: d["base_token"]):
+        snapshot = apply_delta(snapshot, delta)
+    return snapshot
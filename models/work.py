@@ -0,0 +1,11 @@
+from datetime import date
+from typing import NamedTuple
+
+from models.work_type import WorkType
+
+
+class Work(NamedTuple):
+    """Класс представляет собой выполненную работу."""
+    work_type: WorkType
+    minutes: int  # длительность в минутах
+    work_date: date  # дата выполнения